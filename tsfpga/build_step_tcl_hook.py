@@ -15,6 +15,8 @@ class BuildStepTclHook:
     Represent a TCL file that shall be used as hook in one of the build steps.
     """
 
+    __slots__ = ("tcl_file", "_hook_step", "_step_is_synth")
+
     def __init__(self, tcl_file: Path, hook_step: str) -> None:
         """
         Arguments:
@@ -27,12 +29,25 @@ class BuildStepTclHook:
         self.tcl_file = tcl_file
         self.hook_step = hook_step
 
+    @property
+    def hook_step(self) -> str:
+        """
+        Name of the build step.
+        """
+        return self._hook_step
+
+    @hook_step.setter
+    def hook_step(self, value: str) -> None:
+        self._hook_step = value
+        # Calculated once here, instead of every time 'step_is_synth' is accessed.
+        self._step_is_synth = "synth" in value.lower()
+
     @property
     def step_is_synth(self) -> bool:
         """
         True if the build step is in synthesis. False otherwise.
         """
-        return "synth" in self.hook_step.lower()
+        return self._step_is_synth
 
     def __str__(self) -> str:
         result = str(self.__class__.__name__) + ":"
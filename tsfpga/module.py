@@ -7,24 +7,13 @@
 # --------------------------------------------------------------------------------------------------
 
 # Standard libraries
+import os
 import random
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Union
 
 # Third party libraries
-from hdl_registers.generator.vhdl.axi_lite.wrapper import VhdlAxiLiteWrapperGenerator
-from hdl_registers.generator.vhdl.record_package import VhdlRecordPackageGenerator
-from hdl_registers.generator.vhdl.register_package import VhdlRegisterPackageGenerator
-from hdl_registers.generator.vhdl.simulation.check_package import (
-    VhdlSimulationCheckPackageGenerator,
-)
-from hdl_registers.generator.vhdl.simulation.read_write_package import (
-    VhdlSimulationReadWritePackageGenerator,
-)
-from hdl_registers.generator.vhdl.simulation.wait_until_package import (
-    VhdlSimulationWaitUntilPackageGenerator,
-)
-from hdl_registers.parser.toml import from_toml
 from hdl_registers.register import Register
 from hdl_registers.register_list import RegisterList
 
@@ -40,7 +29,7 @@ if TYPE_CHECKING:
     from .vivado.project import VivadoProject
 
 
-class BaseModule:
+class BaseModule:  # pylint: disable=too-many-instance-attributes
     """
     Base class for handling a HDL module with RTL code, constraints, etc.
 
@@ -72,17 +61,58 @@ class BaseModule:
             default_registers: Default registers.
             kwargs: Further parameters sent along to ``super().__init__``.
         """
-        self.path = path.resolve()
+        self.path = _resolve_module_path(path)
         self.name = path.name
         self.library_name = library_name
 
         self._default_registers = default_registers
         self._registers: Optional[RegisterList] = None
+        self._registers_have_been_created = False
+
+        # Result of the synthesis file scan, for each set of filter arguments.
+        self._synthesis_files_cache: dict[tuple[Any, ...], list[HdlFile]] = {}
+        # All files in each folder that has been searched.
+        self._folder_files_cache: dict[Path, list[tuple[str, Path]]] = {}
 
         super().__init__(**kwargs)
 
-    @staticmethod
+    def _get_folder_files(self, folder: Path) -> list[tuple[str, Path]]:
+        """
+        Get all the files in a folder. Will be an empty list if the folder does not exist,
+        or is not a folder.
+        Each file is returned together with its name in lower case, which is what the file
+        ending filter operates on.
+
+        Many of the folders are searched multiple times, e.g. the synthesis folders are searched
+        when getting both synthesis, simulation and documentation files.
+        Hence the result is cached, so that each folder is scanned only once.
+        """
+        if folder not in self._folder_files_cache:
+            try:
+                # Use 'os.scandir' rather than 'Path.glob', since the directory entries it yields
+                # cache the file type information.
+                # Which means that we do not need to do an additional 'stat' call for each entry
+                # in order to check if it is a file.
+                with os.scandir(folder) as entries:
+                    folder_files = [
+                        (entry.name.lower(), Path(entry.path))
+                        for entry in entries
+                        if entry.is_file()
+                    ]
+            except (FileNotFoundError, NotADirectoryError):
+                # Many of the folders that we search will typically not exist.
+                # There might also be a file with the same name as one of the folders.
+                # A failing 'os.scandir' is one single syscall, same as an 'os.path.isdir' probe
+                # would be, so there is nothing to gain from checking existence first.
+                # The empty result is cached, so a missing folder is probed only once.
+                folder_files = []
+
+            self._folder_files_cache[folder] = folder_files
+
+        return self._folder_files_cache[folder]
+
     def _get_file_list(
+        self,
         folders: list[Path],
         file_endings: Union[str, tuple[str, ...]],
         files_include: Optional[set[Path]] = None,
@@ -97,22 +127,29 @@ class BaseModule:
             files_include: Optionally filter to only include these files.
             files_avoid: Optionally filter to discard these files.
         """
-        files = []
-        for folder in folders:
-            for file in folder.glob("*"):
-                if not file.is_file():
-                    continue
-
-                if not file.name.lower().endswith(file_endings):
-                    continue
-
-                if files_include is not None and file not in files_include:
-                    continue
+        # Normalize the file endings once, instead of per directory entry.
+        # Matching is case insensitive, so the file endings must be in lower case as well.
+        if isinstance(file_endings, str):
+            file_endings = (file_endings,)
+        file_endings = tuple(file_ending.lower() for file_ending in file_endings)
+
+        files = [
+            file
+            for folder in folders
+            for file_name_lower, file in self._get_folder_files(folder)
+            if file_name_lower.endswith(file_endings)
+        ]
 
-                if files_avoid is not None and file in files_avoid:
-                    continue
+        # Hashing and comparing strings is a lot faster than doing the same for 'Path' objects.
+        # Note that 'normcase' does nothing on POSIX, but makes the comparison case insensitive
+        # on Windows, which is the behavior of 'Path' comparison.
+        if files and files_include is not None:
+            files_include_strings = {os.path.normcase(path) for path in files_include}
+            files = [file for file in files if os.path.normcase(file) in files_include_strings]
 
-                files.append(file)
+        if files and files_avoid is not None:
+            files_avoid_strings = {os.path.normcase(path) for path in files_avoid}
+            files = [file for file in files if os.path.normcase(file) not in files_avoid_strings]
 
         return files
 
@@ -128,21 +165,15 @@ class BaseModule:
         """
         Return a list of HDL file objects.
         """
-        file_endings: tuple[str, ...] = tuple()
-        if include_vhdl_files:
-            file_endings += HdlFile.file_endings_mapping[HdlFile.Type.VHDL]
-        if include_verilog_files:
-            file_endings += HdlFile.file_endings_mapping[HdlFile.Type.VERILOG_SOURCE]
-            file_endings += HdlFile.file_endings_mapping[HdlFile.Type.VERILOG_HEADER]
-        if include_systemverilog_files:
-            file_endings += HdlFile.file_endings_mapping[HdlFile.Type.SYSTEMVERILOG_SOURCE]
-            file_endings += HdlFile.file_endings_mapping[HdlFile.Type.SYSTEMVERILOG_HEADER]
-
         return [
             HdlFile(path=file_path)
             for file_path in self._get_file_list(
                 folders=folders,
-                file_endings=file_endings,
+                file_endings=_get_hdl_file_endings(
+                    include_vhdl_files=include_vhdl_files,
+                    include_verilog_files=include_verilog_files,
+                    include_systemverilog_files=include_systemverilog_files,
+                ),
                 files_include=files_include,
                 files_avoid=files_avoid,
             )
@@ -162,16 +193,26 @@ class BaseModule:
         Will be ``None`` if the module doesn't have any registers.
         I.e. if no TOML file exists and no hook creates registers.
         """
-        if self._registers:
-            # Only create object from TOML once.
+        if self._registers_have_been_created:
+            # Only create object from TOML, and run the hook, once.
+            # Note that the result might be None, so we can not check the value itself.
             return self._registers
 
         toml_file = self.register_data_file
         if toml_file.exists():
+            # Import here rather than at the top of the file, so that the import cost is only
+            # paid when a module actually has registers.
+            # pylint: disable=import-outside-toplevel
+            # Third party libraries
+            from hdl_registers.parser.toml import from_toml
+
             self._registers = from_toml(
                 name=self.name, toml_file=toml_file, default_registers=self._default_registers
             )
 
+        # Set before calling the hook, since the hook will typically access this property.
+        self._registers_have_been_created = True
+
         self.registers_hook()
         return self._registers
 
@@ -196,6 +237,16 @@ class BaseModule:
         If this module does not have registers, this method does nothing.
         """
         if self.registers is not None:
+            # pylint: disable=import-outside-toplevel
+            # Third party libraries
+            from hdl_registers.generator.vhdl.axi_lite.wrapper import (
+                VhdlAxiLiteWrapperGenerator,
+            )
+            from hdl_registers.generator.vhdl.record_package import VhdlRecordPackageGenerator
+            from hdl_registers.generator.vhdl.register_package import (
+                VhdlRegisterPackageGenerator,
+            )
+
             # Delete any old file that might exist so we don't have multiple and
             # outdated definitions.
             # This package location was used before the separate register folders were introduced,
@@ -203,6 +254,7 @@ class BaseModule:
             old_regs_pkg = self.path / f"{self.name}_regs_pkg.vhd"
             if old_regs_pkg.exists():
                 old_regs_pkg.unlink()
+                self._folder_files_cache.pop(self.path, None)
 
             if self.create_register_package:
                 VhdlRegisterPackageGenerator(
@@ -219,6 +271,9 @@ class BaseModule:
                     register_list=self.registers, output_folder=self.register_synthesis_folder
                 ).create_if_needed()
 
+            # Files might have been created, so the folder must be scanned again.
+            self._folder_files_cache.pop(self.register_synthesis_folder, None)
+
     def create_register_simulation_files(self) -> None:
         """
         Create the register artifacts that are needed for simulation.
@@ -228,6 +283,18 @@ class BaseModule:
         If this module does not have registers, this method does nothing.
         """
         if self.registers is not None:
+            # pylint: disable=import-outside-toplevel
+            # Third party libraries
+            from hdl_registers.generator.vhdl.simulation.check_package import (
+                VhdlSimulationCheckPackageGenerator,
+            )
+            from hdl_registers.generator.vhdl.simulation.read_write_package import (
+                VhdlSimulationReadWritePackageGenerator,
+            )
+            from hdl_registers.generator.vhdl.simulation.wait_until_package import (
+                VhdlSimulationWaitUntilPackageGenerator,
+            )
+
             if self.create_simulation_read_write_package:
                 VhdlSimulationReadWritePackageGenerator(
                     register_list=self.registers, output_folder=self.register_simulation_folder
@@ -243,6 +310,9 @@ class BaseModule:
                     register_list=self.registers, output_folder=self.register_simulation_folder
                 ).create_if_needed()
 
+            # Files might have been created, so the folder must be scanned again.
+            self._folder_files_cache.pop(self.register_simulation_folder, None)
+
     @property
     def synthesis_folders(self) -> list[Path]:
         """
@@ -311,6 +381,14 @@ class BaseModule:
         It is recommended to overload this function in a subclass in your ``module_*.py``,
         and call this super method with the arguments supplied.
 
+        Note that the list of files found in the file system is cached within the module object,
+        for each unique set of filter arguments.
+        The contents of each folder are also cached, and shared by all the ``get_*`` methods of
+        this class.
+        Hence files that are added to the module folders after the first call will not be found.
+        Generated register artifacts are an exception, since their folders are scanned again
+        when the artifacts are created.
+
         Arguments:
             files_include: Optionally filter to only include these files.
             files_avoid: Optionally filter to discard these files.
@@ -326,16 +404,32 @@ class BaseModule:
         Return:
             Files that should be included in a synthesis project.
         """
+        # Register artifacts are always updated, since registers might have been changed by
+        # e.g. a pre-build hook since the last call.
         self.create_register_synthesis_files()
 
-        return self._get_hdl_file_list(
-            folders=self.synthesis_folders,
-            files_include=files_include,
-            files_avoid=files_avoid,
-            include_vhdl_files=include_vhdl_files,
-            include_verilog_files=include_verilog_files,
-            include_systemverilog_files=include_systemverilog_files,
+        # This method is called many times for each module during a build or simulation run,
+        # and the files in the module folders are not expected to change in the meantime.
+        # Hence the result of the file system scan is cached.
+        cache_key = (
+            None if files_include is None else frozenset(files_include),
+            None if files_avoid is None else frozenset(files_avoid),
+            include_vhdl_files,
+            include_verilog_files,
+            include_systemverilog_files,
         )
+        if cache_key not in self._synthesis_files_cache:
+            self._synthesis_files_cache[cache_key] = self._get_hdl_file_list(
+                folders=self.synthesis_folders,
+                files_include=files_include,
+                files_avoid=files_avoid,
+                include_vhdl_files=include_vhdl_files,
+                include_verilog_files=include_verilog_files,
+                include_systemverilog_files=include_systemverilog_files,
+            )
+
+        # Return a copy so that the caller can not modify the cached list.
+        return self._synthesis_files_cache[cache_key].copy()
 
     def get_simulation_files(  # pylint: disable=too-many-arguments
         self,
@@ -351,6 +445,9 @@ class BaseModule:
         See :meth:`.get_synthesis_files` for instructions on how to use ``files_include``
         and ``files_avoid``.
 
+        Note that the contents of each folder are cached, as described
+        in :meth:`.get_synthesis_files`.
+
         Arguments:
             include_tests: When ``False``, the ``test`` files are not included
                 (the ``sim`` files are always included).
@@ -412,6 +509,9 @@ class BaseModule:
         register package.
         Overwrite in a subclass if you want to change this behavior.
 
+        Files added to the module folders after they have been scanned once will not be found.
+        See :meth:`.get_synthesis_files`.
+
         Arguments:
             files_include: Optionally filter to only include these files.
             files_avoid: Optionally filter to discard these files.
@@ -459,6 +559,9 @@ class BaseModule:
         you can pass on ``kwargs`` arguments from the build/simulation flow to
         :class:`.ip_core_file.IpCoreFile` creation to achieve this parameterization.
 
+        Note that the ``ip_cores`` folder is scanned only once per module object.
+        See :meth:`.get_synthesis_files`.
+
         Arguments:
             files_include: Optionally filter to only include these files.
             files_avoid: Optionally filter to discard these files.
@@ -492,6 +595,9 @@ class BaseModule:
         """
         Constraints that shall be applied to a certain entity within this module.
 
+        Note that the constraint folders are scanned only once per module object.
+        See :meth:`.get_synthesis_files`.
+
         Arguments:
             files_include: Optionally filter to only include these files.
             files_avoid: Optionally filter to discard these files.
@@ -595,20 +701,14 @@ class BaseModule:
         Return:
             For example ``MyBaseName.GenericA_ValueA.GenericB_ValueB``.
         """
-        if name:
-            test_case_name = name
-        else:
-            test_case_name = ""
+        if not generics:
+            return name if name else ""
 
-        if generics:
-            generics_string = ".".join([f"{key}_{value}" for key, value in generics.items()])
+        # Note that 'str.join' is faster with a list than with a generator expression, since it
+        # needs to materialize the sequence anyway.
+        generics_string = ".".join([f"{key}_{value}" for key, value in generics.items()])
 
-            if test_case_name:
-                test_case_name = f"{name}.{generics_string}"
-            else:
-                test_case_name = generics_string
-
-        return test_case_name
+        return f"{name}.{generics_string}" if name else generics_string
 
     def add_vunit_config(  # pylint: disable=too-many-arguments
         self,
@@ -651,8 +751,9 @@ class BaseModule:
         # returns True if it is an integer or a bool.
         if isinstance(set_random_seed, bool):
             if set_random_seed:
-                # Use the maximum range for a natural in VHDL-2008
-                generics["seed"] = random.randint(0, 2**31 - 1)
+                # Use the maximum range for a natural in VHDL-2008, i.e. [0, 2**31 - 1].
+                # Same distribution as 'randint' but a lot faster.
+                generics["seed"] = random.getrandbits(31)
 
         elif isinstance(set_random_seed, int):
             generics["seed"] = set_random_seed
@@ -763,11 +864,61 @@ def get_module(
     return modules[0]
 
 
+def _resolve_module_path(path: Path) -> Path:
+    """
+    Same result as ``path.resolve()``, i.e. an absolute path with symlinks resolved.
+    Note that e.g. :class:`.GitSimulationSubset` relies on the module path being canonical.
+
+    Resolving a path requires file system access for each part of the path, which is noticeable
+    when there are many modules.
+    Typically all modules are located in the same few modules folders though.
+    So resolve the parent folder only once, and check only the last part of the path for
+    each module.
+    """
+    if path.is_absolute() and path.name not in ("", "..") and not path.is_symlink():
+        return _resolve_folder(path.parent) / path.name
+
+    return path.resolve()
+
+
+@lru_cache(maxsize=None)
+def _resolve_folder(folder: Path) -> Path:
+    return folder.resolve()
+
+
+@lru_cache(maxsize=None)
+def _get_hdl_file_endings(
+    include_vhdl_files: bool, include_verilog_files: bool, include_systemverilog_files: bool
+) -> tuple[str, ...]:
+    """
+    Get the file endings for the HDL file types that shall be included.
+    The result is cached since there are only a few possible combinations of arguments, and
+    this is called once for every file list that is gathered.
+    """
+    file_endings: tuple[str, ...] = tuple()
+    if include_vhdl_files:
+        file_endings += HdlFile.file_endings_mapping[HdlFile.Type.VHDL]
+    if include_verilog_files:
+        file_endings += HdlFile.file_endings_mapping[HdlFile.Type.VERILOG_SOURCE]
+        file_endings += HdlFile.file_endings_mapping[HdlFile.Type.VERILOG_HEADER]
+    if include_systemverilog_files:
+        file_endings += HdlFile.file_endings_mapping[HdlFile.Type.SYSTEMVERILOG_SOURCE]
+        file_endings += HdlFile.file_endings_mapping[HdlFile.Type.SYSTEMVERILOG_HEADER]
+
+    return file_endings
+
+
 def _iterate_module_folders(modules_folders: list[Path]) -> Iterable[Path]:
     for modules_folder in modules_folders:
-        for module_folder in modules_folder.glob("*"):
-            if module_folder.is_dir():
-                yield module_folder
+        try:
+            # Directory entries from 'os.scandir' cache the file type, which saves us one 'stat'
+            # call per entry compared to 'Path.glob' + 'Path.is_dir'.
+            with os.scandir(modules_folder) as entries:
+                module_folders = [Path(entry.path) for entry in entries if entry.is_dir()]
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        yield from module_folders
 
 
 def _get_module_object(
@@ -126,7 +126,9 @@ register documentation.
 
         all_builds = self._module.get_build_projects()
 
-        rst = ""
+        # Gather parts in a list and join at the end, since the RST for each file can be
+        # quite long and there might be many files.
+        rst_parts: list[str] = []
 
         for vhdl_file_path in self._get_vhdl_files(
             exclude_files=exclude_files, exclude_folders=exclude_module_paths
@@ -142,14 +144,16 @@ register documentation.
                 ):
                     netlist_builds.append(project)
 
-            rst += self._get_vhdl_file_rst(
-                vhdl_file_path=vhdl_file_path,
-                heading_character=heading_character,
-                heading_character_2=heading_character_2,
-                netlist_builds=netlist_builds,
+            rst_parts.append(
+                self._get_vhdl_file_rst(
+                    vhdl_file_path=vhdl_file_path,
+                    heading_character=heading_character,
+                    heading_character_2=heading_character_2,
+                    netlist_builds=netlist_builds,
+                )
             )
 
-        return rst
+        return "".join(rst_parts)
 
     def get_rst_document(self, exclude_module_folders: Optional[list[str]] = None) -> str:
         """
@@ -381,18 +385,21 @@ generic configuration.
                     if checker_name not in checker_names:
                         checker_names.append(checker_name)
 
+            # Gather the table rows in a list and join at the end.
+            rst_parts = [rst]
+
             # Fill in the header row
-            rst += "  * - Generics\n"
+            rst_parts.append("  * - Generics\n")
             for checker_name in checker_names:
-                rst += f"    - {checker_name}\n"
+                rst_parts.append(f"    - {checker_name}\n")
 
             # Make one row for each netlist build
             for build_idx, generic_dict in enumerate(generics):
                 generic_strings = [f"{name} = {value}" for name, value in generic_dict.items()]
                 generics_rst = "\n\n      ".join(generic_strings)
 
-                rst += f"""\
-  * - {generics_rst}"""
+                rst_parts.append(f"""\
+  * - {generics_rst}""")
 
                 # If the "top" of the project is different than the entity, we assume that it
                 # is a wrapper. Add a note to the table about this. This occurs e.g. in the reg_file
@@ -408,15 +415,17 @@ generic configuration.
                         # two builds in the reg_file module.
                         leader = ""
 
-                    rst += f"""\
+                    rst_parts.append(f"""\
 {leader}(Using wrapper
 
-      {netlist_builds[build_idx].top}.vhd)"""
+      {netlist_builds[build_idx].top}.vhd)""")
 
-                rst += "\n"
+                rst_parts.append("\n")
 
                 for checker_name in checker_names:
                     checker_value = checkers[build_idx][checker_name]
-                    rst += f"    - {checker_value}\n"
+                    rst_parts.append(f"    - {checker_value}\n")
+
+            rst = "".join(rst_parts)
 
         return rst
@@ -18,5 +18,11 @@ def test_step_is_synth():
     assert not BuildStepTclHook(Path(), "STEPS.ROUTE_DESIGN.TCL.PRE").step_is_synth
 
 
+def test_step_is_synth_is_updated_when_hook_step_is_changed():
+    hook = BuildStepTclHook(Path(), "STEPS.SYNTH_DESIGN.TCL.PRE")
+    hook.hook_step = "STEPS.ROUTE_DESIGN.TCL.PRE"
+    assert not hook.step_is_synth
+
+
 def test_can_cast_to_string_without_error():
     str(BuildStepTclHook(Path("some_file.tcl"), "STEPS.SYNTH_DESIGN.TCL.PRE"))
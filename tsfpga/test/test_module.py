@@ -7,11 +7,24 @@
 # --------------------------------------------------------------------------------------------------
 
 # Standard libraries
+import os
 from pathlib import Path
 from unittest.mock import ANY, MagicMock, patch
 
 # Third party libraries
 import pytest
+from hdl_registers.generator.vhdl.axi_lite.wrapper import VhdlAxiLiteWrapperGenerator
+from hdl_registers.generator.vhdl.record_package import VhdlRecordPackageGenerator
+from hdl_registers.generator.vhdl.register_package import VhdlRegisterPackageGenerator
+from hdl_registers.generator.vhdl.simulation.check_package import (
+    VhdlSimulationCheckPackageGenerator,
+)
+from hdl_registers.generator.vhdl.simulation.read_write_package import (
+    VhdlSimulationReadWritePackageGenerator,
+)
+from hdl_registers.generator.vhdl.simulation.wait_until_package import (
+    VhdlSimulationWaitUntilPackageGenerator,
+)
 
 # First party libraries
 from tsfpga.module import BaseModule, get_module, get_modules
@@ -133,6 +146,88 @@ def test_file_list_filtering(tmp_path):
     assert files == test_files | sim_files
 
 
+def test_get_synthesis_files_scans_file_system_only_once_for_each_filter(tmp_path):
+    synth_file = create_file(tmp_path / "a" / "src" / "syn.vhd")
+    module = BaseModule(path=tmp_path / "a", library_name="a")
+
+    # pylint: disable=protected-access
+    with patch(
+        "tsfpga.module.BaseModule._get_hdl_file_list", wraps=module._get_hdl_file_list
+    ) as get_hdl_file_list:
+        assert {file.path for file in module.get_synthesis_files()} == {synth_file}
+        assert {file.path for file in module.get_synthesis_files()} == {synth_file}
+        assert get_hdl_file_list.call_count == 1
+
+        assert not module.get_synthesis_files(files_avoid={synth_file})
+        assert not module.get_synthesis_files(files_avoid={synth_file})
+        assert get_hdl_file_list.call_count == 2
+
+        assert not module.get_synthesis_files(include_vhdl_files=False)
+        assert get_hdl_file_list.call_count == 3
+
+    # Modifying the returned list shall not affect the cached result.
+    module.get_synthesis_files().clear()
+    assert {file.path for file in module.get_synthesis_files()} == {synth_file}
+
+
+def test_each_folder_is_scanned_only_once(tmp_path):
+    path = tmp_path / "a"
+    synth_file = create_file(path / "src" / "syn.vhd")
+    sim_file = create_file(path / "sim" / "sim.vhd")
+    test_file = create_file(path / "test" / "test.vhd")
+
+    module = BaseModule(path=path, library_name="a")
+
+    with patch("tsfpga.module.os.scandir", wraps=os.scandir) as scandir:
+        assert {file.path for file in module.get_simulation_files()} == {
+            synth_file,
+            sim_file,
+            test_file,
+        }
+        assert {file.path for file in module.get_documentation_files()} == {synth_file, sim_file}
+        module.get_scoped_constraints()
+
+        scanned_folders = [Path(call_args.args[0]) for call_args in scandir.call_args_list]
+        assert len(scanned_folders) == len(set(scanned_folders))
+
+
+def test_missing_folders_are_probed_only_once(tmp_path):
+    module = BaseModule(path=tmp_path / "a", library_name="a")
+
+    with patch("tsfpga.module.os.scandir", wraps=os.scandir) as scandir:
+        assert not module.get_simulation_files()
+        call_count = scandir.call_count
+        assert call_count > 0
+
+        assert not module.get_simulation_files(include_tests=False)
+        assert not module.get_documentation_files()
+        assert scandir.call_count == call_count
+
+
+def test_file_with_same_name_as_source_folder_is_ignored(tmp_path):
+    create_file(tmp_path / "a" / "src")
+    create_file(tmp_path / "a" / "sim")
+    create_file(tmp_path / "a" / "hest.vhd")
+
+    module = BaseModule(path=tmp_path / "a", library_name="a")
+    assert {file.path.name for file in module.get_synthesis_files()} == {"hest.vhd"}
+    assert {file.path.name for file in module.get_simulation_files()} == {"hest.vhd"}
+
+
+def test_register_artifacts_are_found_even_if_folder_was_scanned_before_creation(tmp_path):
+    create_file(tmp_path / "a" / "regs_a.toml", "register.apa.mode = 'r_w'")
+    module = BaseModule(path=tmp_path / "a", library_name="a")
+
+    # Will scan the register folders, but does not create the register artifacts.
+    assert not module.get_documentation_files()
+
+    synthesis_files = {file.path for file in module.get_synthesis_files()}
+    assert module.register_synthesis_folder / "a_regs_pkg.vhd" in synthesis_files
+
+    simulation_files = {file.path for file in module.get_simulation_files()}
+    assert module.register_simulation_folder / "a_register_read_write_pkg.vhd" in simulation_files
+
+
 def test_get_synthesis_files_calls_get_simulation_files_with_correct_arguments():
     module = BaseModule(path=Path(), library_name="")
     with patch("tsfpga.module.BaseModule.get_synthesis_files") as get_synthesis_files:
@@ -196,6 +291,16 @@ def test_get_systemverilog_files(tmp_path):
     assert {hdl_file.path for hdl_file in got_hdl_files} == paths
 
 
+def test_file_ending_matching_is_case_insensitive(tmp_path):
+    paths = {create_file(tmp_path / "apa.VHD"), create_file(tmp_path / "apa.Tcl")}
+    create_file(tmp_path / "apa.txt")
+
+    module = BaseModule(path=tmp_path, library_name="")
+    # pylint: disable=protected-access
+    files = module._get_file_list(folders=[tmp_path], file_endings=("vhd", "TCL"))
+    assert set(files) == paths
+
+
 def test_get_documentation_files(tmp_path):
     module_name = "zebra"
     path = tmp_path / module_name
@@ -229,6 +334,16 @@ def test_scoped_constraints(tmp_path):
     assert scoped_constraints[0].ref == "hest"
 
 
+def test_scoped_constraints_does_not_get_synthesis_files_when_there_are_no_constraints(tmp_path):
+    module_path = tmp_path / "apa"
+    create_file(module_path / "src" / "hest.vhd")
+
+    module = BaseModule(module_path, "apa")
+    with patch("tsfpga.module.BaseModule.get_synthesis_files") as get_synthesis_files:
+        assert not module.get_scoped_constraints()
+        get_synthesis_files.assert_not_called()
+
+
 def test_scoped_constraint_entity_not_existing_should_raise_error(tmp_path):
     module_path = tmp_path / "apa"
     create_file(module_path / "scoped_constraints" / "hest.tcl")
@@ -239,11 +354,43 @@ def test_scoped_constraint_entity_not_existing_should_raise_error(tmp_path):
     assert str(exception_info.value).startswith("Could not find a matching entity file")
 
 
+def test_module_path_is_absolute_and_normalized(tmp_path):
+    assert BaseModule(path=Path("apa"), library_name="").path == Path("apa").resolve()
+    assert BaseModule(path=tmp_path / "apa", library_name="").path == (tmp_path / "apa").resolve()
+    assert (
+        BaseModule(path=tmp_path / "hest" / ".." / "apa", library_name="").path
+        == (tmp_path / "apa").resolve()
+    )
+
+
+def test_module_path_has_symlinks_resolved(tmp_path):
+    real_modules_folder = create_directory(tmp_path / "real")
+    create_directory(real_modules_folder / "apa")
+    create_directory(real_modules_folder / "real_hest")
+
+    modules_folder = tmp_path / "link"
+    modules_folder.symlink_to(real_modules_folder, target_is_directory=True)
+    (real_modules_folder / "hest").symlink_to(
+        real_modules_folder / "real_hest", target_is_directory=True
+    )
+
+    apa = BaseModule(path=modules_folder / "apa", library_name="apa")
+    assert apa.path == (real_modules_folder / "apa").resolve()
+    assert apa.register_data_file == (modules_folder / "apa" / "regs_apa.toml").resolve()
+
+    hest = BaseModule(path=modules_folder / "hest", library_name="hest")
+    assert hest.path == (real_modules_folder / "real_hest").resolve()
+    assert hest.name == "hest"
+
+
 def test_can_cast_to_string_without_error():
     str(BaseModule(Path("dummy"), "dummy"))
 
 
 def test_test_case_name():
+    assert BaseModule.test_case_name() == ""
+    assert BaseModule.test_case_name(name="foo") == "foo"
+    assert BaseModule.test_case_name(name="foo", generics={}) == "foo"
     assert (
         BaseModule.test_case_name(generics=dict(apa=3, hest_zebra="foo")) == "apa_3.hest_zebra_foo"
     )
@@ -254,7 +401,7 @@ def test_test_case_name():
 
 
 def test_getting_registers_calls_registers_hook(tmp_path):
-    with patch("tsfpga.module.from_toml", autospec=True) as from_toml, patch(
+    with patch("hdl_registers.parser.toml.from_toml", autospec=True) as from_toml, patch(
         "tsfpga.module.BaseModule.registers_hook", autospec=True
     ) as registers_hook:
         create_file(tmp_path / "a" / "regs_a.toml")
@@ -266,7 +413,7 @@ def test_getting_registers_calls_registers_hook(tmp_path):
         registers_hook.assert_called_once()
         assert registers is not None
 
-    with patch("tsfpga.module.from_toml", autospec=True) as from_toml, patch(
+    with patch("hdl_registers.parser.toml.from_toml", autospec=True) as from_toml, patch(
         "tsfpga.module.BaseModule.registers_hook", autospec=True
     ) as registers_hook:
         module = BaseModule(path=tmp_path / "b", library_name="b")
@@ -279,6 +426,17 @@ def test_getting_registers_calls_registers_hook(tmp_path):
         assert registers is None
 
 
+def test_registers_hook_is_called_only_once_when_module_has_no_registers(tmp_path):
+    with patch("tsfpga.module.BaseModule.registers_hook", autospec=True) as registers_hook:
+        module = BaseModule(path=tmp_path / "a", library_name="a")
+
+        assert module.registers is None
+        assert module.registers is None
+        module.get_synthesis_files()
+
+        registers_hook.assert_called_once()
+
+
 def test_creating_synthesis_files_does_not_create_simulation_files(tmp_path):
     create_file(tmp_path / "a" / "regs_a.toml", "register.apa.mode = 'r_w'")
     module = BaseModule(path=tmp_path / "a", library_name="a")
@@ -395,6 +553,28 @@ def test_stray_file_can_exist_in_modules_folder_without_error(get_modules_test):
     assert len(modules) == 3
 
 
+def test_non_existing_modules_folder_can_be_searched_without_error(get_modules_test):
+    modules = get_modules(
+        modules_folders=[get_modules_test.modules_folder / "d", get_modules_test.modules_folder]
+    )
+    assert set(module.name for module in modules) == set(["a", "b", "c"])
+
+
+def test_modules_folder_that_is_a_file_can_be_searched_without_error(get_modules_test):
+    text_file = create_file(get_modules_test.modules_folder / "text_file.txt")
+    modules = get_modules(modules_folders=[text_file, get_modules_test.modules_folder])
+    assert set(module.name for module in modules) == set(["a", "b", "c"])
+
+
+def test_modules_are_returned_in_the_same_order_as_the_modules_folders(tmp_path):
+    create_directory(tmp_path / "a" / "apa")
+    create_directory(tmp_path / "b" / "hest")
+    create_directory(tmp_path / "c" / "zebra")
+
+    modules = get_modules(modules_folders=[tmp_path / "b", tmp_path / "c", tmp_path / "a"])
+    assert [module.name for module in modules] == ["hest", "zebra", "apa"]
+
+
 def test_local_override_of_module_type(get_modules_test):
     module_file_content = """
 from tsfpga.module import BaseModule
@@ -409,21 +589,18 @@ class Module(BaseModule):
     modules = get_modules(get_modules_test.modules_folder)
 
     assert len(modules) == 3
-    for module in modules:
-        if module.name == "a":
-            assert module.id() == "a"
-        elif module.name == "b":
-            assert module.id() == "b"
-        elif module.name == "c":
-            assert isinstance(module, BaseModule)
-        else:
-            assert False
-
-
-@patch("tsfpga.module.from_toml", autospec=True)
-@patch("tsfpga.module.VhdlRegisterPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlRecordPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlAxiLiteWrapperGenerator.create_if_needed", autospec=True)
+    modules_by_name = {module.name: module for module in modules}
+    assert set(modules_by_name) == {"a", "b", "c"}
+
+    assert modules_by_name["a"].id() == "a"
+    assert modules_by_name["b"].id() == "b"
+    assert isinstance(modules_by_name["c"], BaseModule)
+
+
+@patch("hdl_registers.parser.toml.from_toml", autospec=True)
+@patch.object(VhdlRegisterPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlRecordPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlAxiLiteWrapperGenerator, "create_if_needed", autospec=True)
 def test_register_toml_file_parsed_only_once_when_getting_synthesis_files(
     create3, create2, create1, from_toml, tmp_path
 ):
@@ -439,13 +616,13 @@ def test_register_toml_file_parsed_only_once_when_getting_synthesis_files(
     assert create1.call_count == 2
 
 
-@patch("tsfpga.module.from_toml", autospec=True)
-@patch("tsfpga.module.VhdlRegisterPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlRecordPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlAxiLiteWrapperGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlSimulationReadWritePackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlSimulationCheckPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlSimulationWaitUntilPackageGenerator.create_if_needed", autospec=True)
+@patch("hdl_registers.parser.toml.from_toml", autospec=True)
+@patch.object(VhdlRegisterPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlRecordPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlAxiLiteWrapperGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlSimulationReadWritePackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlSimulationCheckPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlSimulationWaitUntilPackageGenerator, "create_if_needed", autospec=True)
 def test_register_toml_file_parsed_only_once_when_getting_simulation_files(
     create6, create5, create4, create3, create2, create1, from_toml, tmp_path
 ):  # pylint: disable=too-many-arguments
@@ -464,13 +641,13 @@ def test_register_toml_file_parsed_only_once_when_getting_simulation_files(
     assert create1.call_count == 2
 
 
-@patch("tsfpga.module.from_toml", autospec=True)
-@patch("tsfpga.module.VhdlRegisterPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlRecordPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlAxiLiteWrapperGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlSimulationReadWritePackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlSimulationCheckPackageGenerator.create_if_needed", autospec=True)
-@patch("tsfpga.module.VhdlSimulationWaitUntilPackageGenerator.create_if_needed", autospec=True)
+@patch("hdl_registers.parser.toml.from_toml", autospec=True)
+@patch.object(VhdlRegisterPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlRecordPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlAxiLiteWrapperGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlSimulationReadWritePackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlSimulationCheckPackageGenerator, "create_if_needed", autospec=True)
+@patch.object(VhdlSimulationWaitUntilPackageGenerator, "create_if_needed", autospec=True)
 def test_register_toml_file_parsed_only_once_when_getting_mixed_files(
     create6, create5, create4, create3, create2, create1, from_toml, tmp_path
 ):  # pylint: disable=too-many-arguments
@@ -487,3 +664,19 @@ def test_register_toml_file_parsed_only_once_when_getting_mixed_files(
     assert create3.call_count == 2
     assert create2.call_count == 2
     assert create1.call_count == 2
+
+
+def test_folder_lists_can_be_extended_by_subclass(tmp_path):
+    class Module(BaseModule):
+        @property
+        def synthesis_folders(self):
+            folders = super().synthesis_folders
+            folders.append(self.path / "extra")
+            return folders
+
+    module = Module(path=tmp_path / "apa", library_name="apa")
+    synthesis_folders = module.synthesis_folders
+    synthesis_folders_again = module.synthesis_folders
+    assert synthesis_folders == synthesis_folders_again
+    assert synthesis_folders is not synthesis_folders_again
+    assert synthesis_folders_again.count(module.path / "extra") == 1
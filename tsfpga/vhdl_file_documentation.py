@@ -23,6 +23,39 @@ class VhdlFileDocumentation:
     Methods to extract documentation from a VHDL source file.
     """
 
+    # Regular expressions that do not depend on the file contents are compiled only once.
+    _re_documentation_header = re.compile(
+        VHDL_COMMENT_SEPARATOR
+        + r"\n(.+?)\n"
+        + VHDL_COMMENT_SEPARATOR
+        + r"\n(.+?)\n"
+        + VHDL_COMMENT_SEPARATOR
+        + r"\n\n",
+        re.DOTALL,
+    )
+    _re_comment = re.compile(r"--(.*)$", re.MULTILINE)
+    _re_trailing_whitespace = re.compile(r"\s*$", re.MULTILINE)
+    _re_attribute = re.compile(r"^\s*attribute\s+.+", re.MULTILINE)
+    _re_ports_and_generics = re.compile(
+        # Match all the code for generics and ports.
+        # Is non-greedy, so it will only match up until the "end" declaration below.
+        # Generic block optionally
+        r"\s*(.+?)?\s*(\)\s*;\s*)?"
+        # Port block
+        r"port\s*\(\s*(.+?)\s*"
+        #
+        r"\)\s*;\s*$",
+        re.IGNORECASE | re.DOTALL,
+    )
+    _re_generics_open = re.compile(r"generic\s*\(", re.IGNORECASE)
+    # Matches either a default value or a vector range declaration, and everything after it.
+    # Default values are removed, since symbolator stops parsing if it encounters vector default
+    # values (others => ...).
+    # Vector range declarations are removed, since the lines become too long so they don't fit
+    # in the image.
+    # Both are handled with one pattern so that each declaration is scanned only once.
+    _re_default_value_or_vector = re.compile(r"\s*:=.+$|\(.*$", re.DOTALL)
+
     def __init__(self, vhd_file_path: Path) -> None:
         """
         Arguments:
@@ -40,30 +73,21 @@ class VhdlFileDocumentation:
         """
         file_contents = read_file(self._vhd_file_path)
 
-        documentation_header_regexp = re.compile(
-            VHDL_COMMENT_SEPARATOR
-            + r"\n(.+?)\n"
-            + VHDL_COMMENT_SEPARATOR
-            + r"\n(.+?)\n"
-            + VHDL_COMMENT_SEPARATOR
-            + r"\n\n",
-            re.DOTALL,
-        )
-        match = documentation_header_regexp.search(file_contents)
+        match = self._re_documentation_header.search(file_contents)
         if match is None:
             return None
 
         # The first group will match the copyright header. Second group is documentation.
         lines = match.group(2).split("\n")
-        text = ""
+        text_lines: list[str] = []
         for line in lines:
             if line == "--":
-                text += "\n"
+                text_lines.append("\n")
             else:
                 # Remove initial "-- " from comments
-                text += f"{line[3:]}\n"
+                text_lines.append(f"{line[3:]}\n")
 
-        return text
+        return "".join(text_lines)
 
     def get_symbolator_component(  # pylint: disable=too-many-locals,too-many-statements
         self,
@@ -113,10 +137,10 @@ class VhdlFileDocumentation:
             return ""
 
         # Remove comments so that the remaining VHDL is easier to parse.
-        vhdl = re.sub(pattern=r"--(.*)$", repl=replace_comment, string=vhdl, flags=re.MULTILINE)
+        vhdl = self._re_comment.sub(repl=replace_comment, string=vhdl)
 
         # Strip trailing whitespace and empty lines.
-        vhdl = re.sub(pattern=r"\s*$", repl="", string=vhdl, flags=re.MULTILINE)
+        vhdl = self._re_trailing_whitespace.sub(repl="", string=vhdl)
 
         # Split out the entity declaration from the VHDL file.
         entity_name = self._vhd_file_path.stem
@@ -143,24 +167,10 @@ class VhdlFileDocumentation:
         ports_and_generics = match.group(1)
 
         # Remove attribute lines within the entity declaration.
-        ports_and_generics = re.sub(
-            pattern=r"^\s*attribute\s+.+", repl="", string=ports_and_generics, flags=re.MULTILINE
-        )
+        ports_and_generics = self._re_attribute.sub(repl="", string=ports_and_generics)
 
         # Slit out the generic part and the port part from the entity declaration.
-        ports_and_generics_regexp = re.compile(
-            # Match all the code for generics and ports.
-            # Is non-greedy, so it will only match up until the "end" declaration below.
-            # Generic block optionally
-            r"\s*(.+?)?\s*(\)\s*;\s*)?"
-            # Port block
-            r"port\s*\(\s*(.+?)\s*"
-            #
-            r"\)\s*;\s*$",
-            re.IGNORECASE | re.DOTALL,
-        )
-
-        match = ports_and_generics_regexp.search(ports_and_generics)
+        match = self._re_ports_and_generics.search(ports_and_generics)
         if match is None:
             print(f"Found no ports or generics in {self._vhd_file_path}")
             return None
@@ -170,22 +180,13 @@ class VhdlFileDocumentation:
             generics = match.group(1)
             assert generics.lower().startswith("generic")
 
-            strip_generics_open = re.compile(r"generic\s*\(", re.IGNORECASE)
-            generics = strip_generics_open.sub(repl="", string=generics)
+            generics = self._re_generics_open.sub(repl="", string=generics)
         else:
             # Only one match, which we assume is ports (generics only is not supported)
             generics = None
 
         ports = match.group(3)
 
-        # Remove default values.
-        # Symbolator stops parsing if it encounters vector default values (others => ...).
-        default_value_regexp = re.compile(r"\s*:=.+$", re.IGNORECASE | re.DOTALL)
-
-        # Remove any vector range declarations in port/generic list.
-        # The lines become too long so they don't fit in the image.
-        vector_regexp = re.compile(r"\(.*$", re.IGNORECASE | re.DOTALL)
-
         def clean_up_declarations(declarations: str) -> str:
             clean_declarations = []
 
@@ -193,8 +194,8 @@ class VhdlFileDocumentation:
             # Note that this fails if there are any ";" in comments, so its import that we
             # strip comments before this.
             for declaration in declarations.split(";"):
-                cleaned = default_value_regexp.sub(repl="", string=declaration)
-                cleaned = vector_regexp.sub(repl="", string=cleaned)
+                # Remove default values and any vector range declarations in port/generic list.
+                cleaned = self._re_default_value_or_vector.sub(repl="", string=declaration)
 
                 clean_declarations.append(cleaned)
 
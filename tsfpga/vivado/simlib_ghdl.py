@@ -8,12 +8,19 @@
 
 # Standard libraries
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional
 
 # First party libraries
 from tsfpga import DEFAULT_FILE_ENCODING
-from tsfpga.system_utils import create_directory, run_command, system_is_windows
+from tsfpga.system_utils import (
+    create_directory,
+    create_file,
+    read_file,
+    run_command,
+    system_is_windows,
+)
 
 # Local folder libraries
 from .simlib_common import VivadoSimlibCommon
@@ -26,6 +33,9 @@ class VivadoSimlibGhdl(VivadoSimlibCommon):
 
     library_names = ["unisim", "secureip", "unimacro", "unifast"]
 
+    _re_ghdl_version_with_tag = re.compile(r"^GHDL (\S+) \((\S+)\).*")
+    _re_ghdl_version_without_tag = re.compile(r"^GHDL (\S+).*")
+
     def __init__(
         self,
         vivado_path: Optional[Path],
@@ -42,15 +52,48 @@ class VivadoSimlibGhdl(VivadoSimlibCommon):
         """
         self.ghdl_binary = Path(simulator_interface.find_prefix()) / "ghdl"
 
+        # Note that this file is outside of the versioned output folder, since the simulator tag
+        # is needed to determine that folder.
+        self._simulator_tag_cache_file = output_path.resolve() / ".ghdl_simulator_tag.txt"
+
         super().__init__(vivado_path=vivado_path, output_path=output_path)
 
         self._vunit_proj = vunit_proj
 
+        # Arguments that are the same for every GHDL call.
+        self._ghdl_common_args = [
+            str(self.ghdl_binary),
+            "-a",
+            "--ieee=synopsys",
+            "--std=08",
+            f"-P{str(self.output_path / 'unisim')}",
+            "-fexplicit",
+            "-frelaxed-rules",
+            "--no-vital-checks",
+            "--warn-binding",
+            "--mb-comments",
+        ]
+
     def _compile(self) -> None:
+        # The other libraries are compiled with 'unisim' available, so it must be done first.
         self._compile_unisim()
-        self._compile_secureip()
-        self._compile_unimacro()
-        self._compile_unifast()
+
+        # The remaining libraries do not depend on each other, and each is compiled into its own
+        # work directory.
+        # The time is spent in the GHDL processes, so use threads to run them in parallel.
+        with ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(compile_library)
+                for compile_library in [
+                    self._compile_secureip,
+                    self._compile_unimacro,
+                    self._compile_unifast,
+                ]
+            ]
+
+            # Will raise any exception that occurred in the thread.
+            for future in futures:
+                future.result()
 
     def _compile_unisim(self) -> None:
         library_path = self._libraries_path / "unisims"
@@ -114,7 +157,7 @@ class VivadoSimlibGhdl(VivadoSimlibCommon):
         with open(
             library_path / "vhdl_analyze_order", encoding=DEFAULT_FILE_ENCODING
         ) as file_handle:
-            for vhd_file_base in file_handle.readlines():
+            for vhd_file_base in file_handle:
                 vhd_file = library_path / vhd_file_base.strip()
                 assert vhd_file.exists(), vhd_file
                 vhd_files.append(vhd_file)
@@ -125,8 +168,9 @@ class VivadoSimlibGhdl(VivadoSimlibCommon):
         """
         Compile a list of files into the specified library.
         """
-        workdir = self.output_path / library_name
-        create_directory(workdir, empty=False)
+        # Note that the output path is already resolved, so this path is absolute.
+        # Create the folder once for the library, not once for each GHDL call.
+        workdir = create_directory(self.output_path / library_name, empty=False)
 
         vhd_paths_str = [str(vhd_file) for vhd_file in vhd_files]
         # We print a list of the files that will be compiled.
@@ -146,56 +190,106 @@ class VivadoSimlibGhdl(VivadoSimlibCommon):
         # While compiling all files in one command gives a huge performance boost
         # (on Linux with GCC backend at least, as far as we know) the resulting command is in
         # the order of 90k characters long.
-        # This does not seem to work on Windows.
-        # So we auto detect the OS to work around this limitation, while keeping the performance
-        # boost on Linux.
+        # This does not seem to work on Windows, where a command can be at most 32767 characters.
+        # So we auto detect the OS and compile in chunks that are well below this limit on Windows,
+        # while keeping the performance boost of one single command on Linux.
         # See https://gitlab.com/tsfpga/tsfpga/-/merge_requests/499
-        compile_file_by_file = system_is_windows()
+        max_chunk_length = 25000 if system_is_windows() else None
 
-        if compile_file_by_file:
-            # Compile each file in a separate command.
-            for vhd_file_idx, vhd_file_str in enumerate(vhd_paths_str):
-                print_compiling(vhd_paths_relative[vhd_file_idx])
-                execute_ghdl(files=[vhd_file_str])
+        chunks = self._split_into_chunks(vhd_paths_str=vhd_paths_str, max_length=max_chunk_length)
 
-        else:
-            # Compile all files in one single command.
-            paths_to_print = ", ".join(vhd_paths_relative)
+        for chunk in chunks:
+            paths_to_print = ", ".join(vhd_paths_relative[vhd_file_idx] for vhd_file_idx in chunk)
             print_compiling(paths_to_print)
-            execute_ghdl(files=vhd_paths_str)
+            execute_ghdl(files=[vhd_paths_str[vhd_file_idx] for vhd_file_idx in chunk])
+
+    @staticmethod
+    def _split_into_chunks(vhd_paths_str: list[str], max_length: Optional[int]) -> list[list[int]]:
+        """
+        Split the files into chunks, where the total length of the file arguments in each chunk
+        is at most ``max_length`` characters.
+        A file that is longer than the limit on its own is placed in a chunk of its own.
+
+        Arguments:
+            vhd_paths_str: The files that shall be compiled.
+            max_length: Maximum length of each chunk.
+                If ``None``, all files are placed in one single chunk.
+
+        Return:
+            Each chunk is a list of indexes into ``vhd_paths_str``.
+            Empty if there are no files, so that GHDL is not called without any files.
+        """
+        if not vhd_paths_str:
+            return []
+
+        chunks: list[list[int]] = [[]]
+        chunk_length = 0
+        for vhd_file_idx, vhd_file_str in enumerate(vhd_paths_str):
+            # Plus one for the space that separates the arguments.
+            file_length = len(vhd_file_str) + 1
+
+            if max_length is not None and chunks[-1] and chunk_length + file_length > max_length:
+                chunks.append([])
+                chunk_length = 0
+
+            chunks[-1].append(vhd_file_idx)
+            chunk_length += file_length
+
+        return chunks
 
     def _execute_ghdl(self, workdir: Path, library_name: str, files: list[str]) -> None:
-        cmd = [
-            str(self.ghdl_binary),
-            "-a",
-            "--ieee=synopsys",
-            "--std=08",
-            f"--workdir={str(workdir.resolve())}",
-            f"-P{str(self.output_path / 'unisim')}",
-            "-fexplicit",
-            "-frelaxed-rules",
-            "--no-vital-checks",
-            "--warn-binding",
-            "--mb-comments",
-            f"--work={library_name}",
-        ] + files
+        cmd = (
+            self._ghdl_common_args + [f"--workdir={str(workdir)}", f"--work={library_name}"] + files
+        )
 
         run_command(cmd, cwd=self.output_path)
 
     def _get_simulator_tag(self) -> str:
         """
         Return simulator version tag as a string.
+
+        Calling GHDL to get the version takes a noticeable amount of time, and is done every time
+        this class is created.
+        Hence the result is cached in a file, keyed on the path, size and modification time of the
+        GHDL binary.
+        So that the tag is re-calculated if GHDL is updated.
         """
+        # The file ending is not needed when calling the binary, but it is needed when
+        # accessing the file.
+        ghdl_binary = (
+            self.ghdl_binary.with_suffix(".exe") if system_is_windows() else self.ghdl_binary
+        )
+
+        try:
+            ghdl_binary_stat = ghdl_binary.stat()
+        except FileNotFoundError:
+            # Can not create a reliable cache key.
+            # The call to GHDL below will most likely fail anyway.
+            return self._get_simulator_tag_from_ghdl()
+
+        cache_key = (
+            f"{ghdl_binary.resolve()} {ghdl_binary_stat.st_size} {ghdl_binary_stat.st_mtime_ns}"
+        )
+
+        if self._simulator_tag_cache_file.exists():
+            cached_key, _, cached_tag = read_file(self._simulator_tag_cache_file).partition("\n")
+            if cached_key == cache_key and cached_tag:
+                return cached_tag
+
+        tag = self._get_simulator_tag_from_ghdl()
+        create_file(self._simulator_tag_cache_file, f"{cache_key}\n{tag}")
+
+        return tag
+
+    def _get_simulator_tag_from_ghdl(self) -> str:
         cmd = [str(self.ghdl_binary), "--version"]
         output = run_command(cmd, capture_output=True).stdout
 
-        regexp_with_tag = re.compile(r"^GHDL (\S+) \((\S+)\).*")
-        match = regexp_with_tag.search(output)
+        match = self._re_ghdl_version_with_tag.search(output)
         if match is not None:
             return self._format_version(f"ghdl_{match.group(1)}_{match.group(2)}")
 
-        regexp_without_tag = re.compile(r"^GHDL (\S+).*")
-        match = regexp_without_tag.search(output)
+        match = self._re_ghdl_version_without_tag.search(output)
         if match is not None:
             return self._format_version(f"ghdl_{match.group(1)}")
 
@@ -19,7 +19,9 @@ from unittest.mock import MagicMock, call, patch
 import pytest
 
 # First party libraries
+from tsfpga.system_utils import create_file
 from tsfpga.vivado.simlib import VivadoSimlib
+from tsfpga.vivado.simlib_ghdl import VivadoSimlibGhdl
 
 
 # pylint: disable=redefined-outer-name
@@ -28,6 +30,8 @@ def simlib_test(tmp_path):
     class SimlibGhdlTestFixture:
         def __init__(self):
             self.output_path = tmp_path / "simlib"
+            # Does not exist unless created by a test. Hence the simulator tag will not be cached.
+            self.ghdl_prefix = tmp_path / "ghdl_bin"
 
             self.vivado_simlib = self.get_vivado_simlib()
 
@@ -37,7 +41,7 @@ def simlib_test(tmp_path):
 
                 simulator_class = MagicMock()
                 simulator_class.name = "ghdl"
-                simulator_class.find_prefix.return_value = "/usr/bin"
+                simulator_class.find_prefix.return_value = str(self.ghdl_prefix)
 
                 vunit_proj = MagicMock()
                 vunit_proj._simulator_class = simulator_class  # pylint: disable=protected-access
@@ -107,14 +111,56 @@ def test_ghdl_version_string(simlib_test):
     )
 
 
-def test_should_compile_file_by_file_on_windows_but_not_on_linux(simlib_test):
+def test_ghdl_version_is_cached_until_binary_is_changed(simlib_test):
+    ghdl_binary = create_file(simlib_test.ghdl_prefix / "ghdl", "binary")
+
+    with patch(
+        "tsfpga.vivado.simlib_ghdl.VivadoSimlibGhdl._get_simulator_tag_from_ghdl", autospec=True
+    ) as get_simulator_tag_from_ghdl:
+        get_simulator_tag_from_ghdl.return_value = "ghdl_1_0"
+        assert ".ghdl_1_0." in simlib_test.get_vivado_simlib().artifact_name
+        assert get_simulator_tag_from_ghdl.call_count == 1
+
+        # Should use the cached value.
+        get_simulator_tag_from_ghdl.return_value = "ghdl_2_0"
+        assert ".ghdl_1_0." in simlib_test.get_vivado_simlib().artifact_name
+        assert get_simulator_tag_from_ghdl.call_count == 1
+
+        # Change of the binary shall invalidate the cache.
+        create_file(ghdl_binary, "updated binary")
+        assert ".ghdl_2_0." in simlib_test.get_vivado_simlib().artifact_name
+        assert get_simulator_tag_from_ghdl.call_count == 2
+
+
+def test_ghdl_version_is_cached_on_windows(simlib_test):
+    create_file(simlib_test.ghdl_prefix / "ghdl.exe", "binary")
+
+    with patch(
+        "tsfpga.vivado.simlib_ghdl.VivadoSimlibGhdl._get_simulator_tag_from_ghdl", autospec=True
+    ) as get_simulator_tag_from_ghdl, patch(
+        "tsfpga.vivado.simlib_ghdl.system_is_windows", autospec=True
+    ) as system_is_windows:
+        system_is_windows.return_value = True
+        get_simulator_tag_from_ghdl.return_value = "ghdl_1_0"
+
+        assert ".ghdl_1_0." in simlib_test.get_vivado_simlib().artifact_name
+        assert ".ghdl_1_0." in simlib_test.get_vivado_simlib().artifact_name
+        assert get_simulator_tag_from_ghdl.call_count == 1
+
+
+def test_should_compile_in_chunks_on_windows_but_not_on_linux(simlib_test):
     library_name = "unisim"
 
     # pylint: disable=protected-access
     unisim_path = simlib_test.vivado_simlib._libraries_path / library_name
     vhd_files = [unisim_path / "a.vhd", unisim_path / "b.vhd"]
+    # Very long paths, so that two of them do not fit within the command length limit on Windows.
+    long_vhd_files = [
+        unisim_path / ("c" * 15000 + ".vhd"),
+        unisim_path / ("d" * 15000 + ".vhd"),
+    ]
 
-    def run_test(is_windows, expected_calls):
+    def run_test(is_windows, vhd_files, expected_calls):
         with patch.object(
             simlib_test.vivado_simlib, "_execute_ghdl", autospec=True
         ) as execute_ghdl, patch(
@@ -134,19 +180,110 @@ def test_should_compile_file_by_file_on_windows_but_not_on_linux(simlib_test):
         )
 
     # One call with many files on e.g. Linux.
+    expected_calls = [get_expected_call(files=[str(vhd_files[0]), str(vhd_files[1])])]
+    run_test(is_windows=False, vhd_files=vhd_files, expected_calls=expected_calls)
+
+    expected_calls = [get_expected_call(files=[str(long_vhd_files[0]), str(long_vhd_files[1])])]
+    run_test(is_windows=False, vhd_files=long_vhd_files, expected_calls=expected_calls)
+
+    # Short paths fit in one call also on Windows.
+    expected_calls = [get_expected_call(files=[str(vhd_files[0]), str(vhd_files[1])])]
+    run_test(is_windows=True, vhd_files=vhd_files, expected_calls=expected_calls)
+
+    # But long paths are split into many calls on Windows.
     expected_calls = [
-        get_expected_call(
-            files=[
-                str(vhd_files[0]),
-                str(vhd_files[1]),
-            ]
-        )
+        get_expected_call(files=[str(long_vhd_files[0])]),
+        get_expected_call(files=[str(long_vhd_files[1])]),
     ]
-    run_test(is_windows=False, expected_calls=expected_calls)
+    run_test(is_windows=True, vhd_files=long_vhd_files, expected_calls=expected_calls)
 
-    # Many calls with individual file on Windows.
-    expected_calls = [
-        get_expected_call(files=[str(vhd_files[0])]),
-        get_expected_call(files=[str(vhd_files[1])]),
+
+def test_split_into_chunks():
+    # pylint: disable=protected-access
+    split_into_chunks = VivadoSimlibGhdl._split_into_chunks
+
+    assert split_into_chunks(vhd_paths_str=[], max_length=None) == []
+    assert split_into_chunks(vhd_paths_str=[], max_length=5) == []
+    assert split_into_chunks(vhd_paths_str=["a", "b", "c"], max_length=None) == [[0, 1, 2]]
+
+    # Each file takes its length plus one for the separating space.
+    assert split_into_chunks(vhd_paths_str=["aaa", "bbb", "ccc"], max_length=8) == [[0, 1], [2]]
+    assert split_into_chunks(vhd_paths_str=["aaa", "bbb", "ccc"], max_length=7) == [[0], [1], [2]]
+
+    # A file that is too long on its own still gets a chunk.
+    assert split_into_chunks(vhd_paths_str=["a" * 10, "b"], max_length=5) == [[0], [1]]
+
+
+def test_execute_ghdl(simlib_test):
+    vivado_simlib = simlib_test.vivado_simlib
+    workdir = vivado_simlib.output_path / "unimacro"
+
+    with patch("tsfpga.vivado.simlib_ghdl.run_command", autospec=True) as run_command:
+        # pylint: disable=protected-access
+        vivado_simlib._execute_ghdl(workdir=workdir, library_name="unimacro", files=["a.vhd"])
+        vivado_simlib._execute_ghdl(workdir=workdir, library_name="unimacro", files=["b.vhd"])
+
+    assert run_command.call_count == 2
+
+    cmd = run_command.call_args_list[0].args[0]
+    assert cmd[0] == str(simlib_test.ghdl_prefix / "ghdl")
+    assert cmd[1] == "-a"
+    assert f"-P{vivado_simlib.output_path / 'unisim'}" in cmd
+    assert f"--workdir={workdir}" in cmd
+    assert "--work=unimacro" in cmd
+    assert cmd[-1] == "a.vhd"
+
+    assert run_command.call_args_list[1].args[0][-1] == "b.vhd"
+
+
+def test_get_compile_order(tmp_path):
+    vhd_files = [create_file(tmp_path / "a.vhd"), create_file(tmp_path / "b.vhd")]
+    create_file(tmp_path / "vhdl_analyze_order", "b.vhd\na.vhd\n")
+
+    # pylint: disable=protected-access
+    assert VivadoSimlibGhdl._get_compile_order(library_path=tmp_path) == [
+        vhd_files[1],
+        vhd_files[0],
     ]
-    run_test(is_windows=True, expected_calls=expected_calls)
+
+
+def test_unisim_is_compiled_before_the_other_libraries(simlib_test):
+    vivado_simlib = simlib_test.vivado_simlib
+    library_names = ["unisim", "secureip", "unimacro", "unifast"]
+
+    compiled = []
+
+    def get_compile_function(library_name):
+        def compile_library():
+            compiled.append(library_name)
+
+        return compile_library
+
+    # pylint: disable=protected-access
+    with patch.multiple(
+        vivado_simlib,
+        **{
+            f"_compile_{library_name}": get_compile_function(library_name)
+            for library_name in library_names
+        },
+    ):
+        vivado_simlib._compile()
+
+    assert compiled[0] == "unisim"
+    assert sorted(compiled) == sorted(library_names)
+
+
+def test_error_when_compiling_a_library_should_propagate(simlib_test):
+    vivado_simlib = simlib_test.vivado_simlib
+
+    # pylint: disable=protected-access
+    with patch.object(vivado_simlib, "_compile_unisim", autospec=True), patch.object(
+        vivado_simlib, "_compile_secureip", autospec=True
+    ), patch.object(vivado_simlib, "_compile_unimacro", autospec=True), patch.object(
+        vivado_simlib, "_compile_unifast", autospec=True
+    ) as compile_unifast:
+        compile_unifast.side_effect = ValueError("GHDL failed")
+
+        with pytest.raises(ValueError) as exception_info:
+            vivado_simlib._compile()
+        assert str(exception_info.value) == "GHDL failed"
@@ -1,9 +1,16 @@
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from itertools import groupby
 from multiprocessing import Process
+import os
 from pathlib import Path
-from shutil import which
+from shutil import copytree, rmtree, which
 import subprocess
+import tempfile
+from threading import Lock
 from typing import Any, List, Optional
+from weakref import WeakValueDictionary
 
 from tsfpga.module_list import ModuleList
 from vunit.source_file import SourceFile
@@ -11,11 +18,22 @@ from vunit.ui import VUnit
 from vunit.vhdl_standard import VHDLStandard
 
 from tsfpga.hdl_file import HdlFile
+from tsfpga.system_utils import create_file
 
 # TODO: Result parsing (utilization, logic levels and static timing)
 # TODO: Generics support
 
 class YosysNetlistBuild:
+    # VUnit projects that are in use by any build, keyed on the libraries and files that were
+    # added to them.
+    # Builds in the same process typically use the same modules, and can share one project since
+    # it is not modified after it has been created.
+    # Note that this assumes that source files do not change between builds in the same process,
+    # since the files are parsed when added to the project.
+    # Weak references, so that a project is released when no build uses it anymore.
+    _vunit_projects: "WeakValueDictionary[Any, VUnit]" = WeakValueDictionary()
+    _vunit_projects_lock = Lock()
+
     def __init__(
         self,
         name: str,
@@ -26,7 +44,27 @@ class YosysNetlistBuild:
         ghdl_path: Optional[Path] = None,
         yosys_path: Optional[Path] = None,
         vhdl_standard: VHDLStandard = VHDLStandard("2008"),
+        ghdl_cache_path: Optional[Path] = None,
     ):
+        """
+        Arguments:
+            name: Project name.
+            modules: Modules that shall be included in the project.
+            top: Name of top level entity.
+                If left out, the top level name will be inferred from the ``name``.
+            synth_command: Yosys synthesis command, e.g. ``synth_xilinx``.
+                If omitted, the generic ``synth`` command will be used.
+            generics: A dict with generics values (name: value).
+            ghdl_path: A path to the GHDL executable.
+                If omitted, the default location from the system PATH will be used.
+            yosys_path: A path to the Yosys executable.
+                If omitted, the default location from the system PATH will be used.
+            vhdl_standard: VHDL standard that the source code is analyzed with.
+            ghdl_cache_path: Optionally, a folder where the results of GHDL analysis are cached.
+                Can be shared between builds.
+                A library is not re-analyzed if its source files, the source files of all
+                libraries analyzed before it, the GHDL binary and the VHDL standard are unchanged.
+        """
         # GHDL output path, GHDL products will be placed here
         self.GHDL_OUT = "ghdl"
         
@@ -34,7 +72,8 @@ class YosysNetlistBuild:
         self.YOSYS_OUT = "yosys"
 
         self.name = name
-        self.modules = modules.copy()
+        # Note that the list is not modified by this class, so there is no need to copy it.
+        self.modules = modules
 
         if synth_command is not None:
             assert synth_command.startswith("synth"), "Must be Yosys synth command"
@@ -43,12 +82,24 @@ class YosysNetlistBuild:
         self.static_generics = {} if generics is None else generics.copy()
         self._ghdl_path = ghdl_path
         self._yosys_path = yosys_path
+        self._ghdl_cache_path = ghdl_cache_path
+
+        # Searching PATH for the tools is relatively slow, so do it only once.
+        self._resolved_ghdl_path: Optional[Path] = None
+        self._resolved_yosys_path: Optional[Path] = None
+
+        # Looking up the top level file searches all files in the VUnit project, so do it only
+        # once.
+        self._top_file: Optional[SourceFile] = None
 
         self.top = name + "_top" if top is None else top
 
         self.is_netlist_build = True
 
         self._vhdl_standard = vhdl_standard
+        # Used for every GHDL call, so create it only once.
+        # E.g. "--std=08" for VHDL-2008.
+        self._ghdl_standard_option = "--std=" + vhdl_standard._standard[2:]
 
         self._vunit_proj = self._create_vunit_project(modules)
 
@@ -56,9 +107,42 @@ class YosysNetlistBuild:
         # in which they need to be loaded into Yosys.
         self._library_compile_order = []
 
-    def _create_vunit_project(sel, modules: ModuleList) -> VUnit:
+        # Resolving the required files walks the whole VUnit dependency graph, so do it only once.
+        self._required_synthesis_files: Optional[List[SourceFile]] = None
+        # Set together, in one single pass over the required files.
+        self._required_vhdl_files: Optional[List[SourceFile]] = None
+        self._required_verilog_files: Optional[List[SourceFile]] = None
+        # Used for every GHDL call, and in the Yosys script.
+        self._ghdl_library_options: Optional[List[str]] = None
+
+    def _create_vunit_project(self, modules: ModuleList) -> VUnit:
+        library_files = []
+        for module in modules:
+            files = []
+            for hdl_file in module.get_synthesis_files():
+                assert hdl_file.type == HdlFile.Type.VHDL, "Only VHDL currently supported"
+                files.append(hdl_file.path)
+
+            library_files.append((module.library_name, tuple(files)))
+
+        key = tuple(library_files)
 
+        with self._vunit_projects_lock:
+            vunit_proj = self._vunit_projects.get(key)
+
+            if vunit_proj is None:
+                vunit_proj = self._create_new_vunit_project(library_files=library_files)
+                self._vunit_projects[key] = vunit_proj
+
+        return vunit_proj
+
+    @staticmethod
+    def _create_new_vunit_project(library_files: List[tuple[str, tuple[Path, ...]]]) -> VUnit:
         dummy_args = Namespace()
+        # Note that VUnit keeps a database of parse results in this folder, keyed on the contents
+        # of each source file.
+        # So source files that have not changed since the previous run are not re-parsed,
+        # and resolving the dependency graph later on is quick.
         dummy_args.output_path = Path("out")
         dummy_args.log_level = "error"
         dummy_args.no_color = True
@@ -66,43 +150,41 @@ class YosysNetlistBuild:
 
         vunit_proj = VUnit.from_args(args=dummy_args)
 
-        for module in modules:
-            vunit_library = vunit_proj.add_library(
-                library_name=module.library_name, allow_duplicate=True
-            )
-            for hdl_file in module.get_synthesis_files():
-                assert hdl_file.type == HdlFile.Type.VHDL, "Only VHDL currently supported"
-                vunit_library.add_source_file(hdl_file.path)
+        for library_name, files in library_files:
+            vunit_library = vunit_proj.add_library(library_name=library_name, allow_duplicate=True)
+            for file in files:
+                vunit_library.add_source_file(file)
 
         return vunit_proj
 
     def _get_ghdl_path(self) -> Path:
-        if self._ghdl_path is not None:
-            return self._ghdl_path.resolve()
+        if self._resolved_ghdl_path is None:
+            self._resolved_ghdl_path = self._resolve_tool_path(name="ghdl", path=self._ghdl_path)
 
-        which_ghdl = which("ghdl")
-        if which_ghdl is None:
-            raise FileNotFoundError("Could not find ghdl on PATH")
-
-        return Path(which_ghdl).resolve()
+        return self._resolved_ghdl_path
 
     def _get_yosys_path(self) -> Path:
-        if self._yosys_path is not None:
-            return self._yosys_path.resolve()
+        if self._resolved_yosys_path is None:
+            self._resolved_yosys_path = self._resolve_tool_path(
+                name="yosys", path=self._yosys_path
+            )
 
-        which_yosys = which("yosys")
-        if which_yosys is None:
-            raise FileNotFoundError("Could not find yosys on PATH")
+        return self._resolved_yosys_path
 
-        return Path(which_yosys).resolve()
+    @staticmethod
+    def _resolve_tool_path(name: str, path: Optional[Path]) -> Path:
+        if path is not None:
+            return path.resolve()
 
-    def _run_process(self, cmd: List[str], cwd: Path):
-        # try:
-        #     Process(args=cmd, cwd=cwd).consume_output()
-        # except:
-        #     return False
-        subprocess.run(cmd, cwd=cwd)
-        return True
+        which_tool = which(name)
+        if which_tool is None:
+            raise FileNotFoundError(f"Could not find {name} on PATH")
+
+        return Path(which_tool).resolve()
+
+    def _run_process(self, cmd: List[str], cwd: Path) -> bool:
+        # Output, including any error messages, is printed directly to the console.
+        return subprocess.run(cmd, cwd=cwd, check=False).returncode == 0
 
     def _get_top_file(self) -> Optional[SourceFile]:
         """
@@ -114,23 +196,33 @@ class YosysNetlistBuild:
         Returns:
             Optional[SourceFile]: File which contains the top level
         """
-        top_file_pattern = "*" + self.top + ".vhd"
+        if self._top_file is not None:
+            return self._top_file
+
+        # Compare the file name exactly, rather than with a pattern like '*<top>.vhd', which would
+        # also match e.g. a file 'not_<top>.vhd'.
+        top_files = [
+            source_file
+            for source_file in self._vunit_proj.get_source_files(allow_empty=True)
+            if Path(source_file.name).stem == self.top
+        ]
 
-        try:
-            vhd_top_file = self._vunit_proj.get_source_file(top_file_pattern)
-        except ValueError:
-            vhd_top_file = None
+        if len(top_files) != 1:
+            return None
 
-        if vhd_top_file is not None:
-            return vhd_top_file
+        self._top_file = top_files[0]
 
-        return None
+        return self._top_file
 
     def _get_required_synthesis_files(self) -> List[SourceFile]:
         """
         Create a list of of only the required files for the top level in the correct compile order.
         Assumes top level file has same name as the source file it is defined in.
+        The result is cached, since it is used in several steps of the build.
         """
+        if self._required_synthesis_files is not None:
+            return self._required_synthesis_files
+
         top_file = self._get_top_file()
 
         if top_file is None:
@@ -143,9 +235,50 @@ class YosysNetlistBuild:
         for file in reversed(implementation_subset):
             if file.library.name not in self._library_compile_order:
                 self._library_compile_order.insert(0, file.library.name)
-        
+
+        self._required_synthesis_files = implementation_subset
+
         return implementation_subset
 
+    def _get_vhdl_files(self) -> List[SourceFile]:
+        """
+        The required VHDL files, in compile order.
+        """
+        self._split_required_synthesis_files()
+        assert self._required_vhdl_files is not None
+
+        return self._required_vhdl_files
+
+    def _get_verilog_files(self) -> List[SourceFile]:
+        """
+        The required Verilog and SystemVerilog files, in compile order.
+        """
+        self._split_required_synthesis_files()
+        assert self._required_verilog_files is not None
+
+        return self._required_verilog_files
+
+    def _split_required_synthesis_files(self) -> None:
+        if self._required_vhdl_files is not None:
+            return
+
+        vhdl_file_endings = HdlFile.file_endings_mapping[HdlFile.Type.VHDL]
+        verilog_file_endings = (
+            HdlFile.file_endings_mapping[HdlFile.Type.VERILOG_SOURCE]
+            + HdlFile.file_endings_mapping[HdlFile.Type.SYSTEMVERILOG_SOURCE]
+        )
+
+        vhdl_files = []
+        verilog_files = []
+        for file in self._get_required_synthesis_files():
+            if file.name.endswith(vhdl_file_endings):
+                vhdl_files.append(file)
+            elif file.name.endswith(verilog_file_endings):
+                verilog_files.append(file)
+
+        self._required_vhdl_files = vhdl_files
+        self._required_verilog_files = verilog_files
+
     def _get_synth_command(self) -> str:
         if self.synth_command is None:
             command = f"synth"
@@ -157,64 +290,223 @@ class YosysNetlistBuild:
         return command
 
     def _get_ghdl_standard_option(self) -> str:
-        return "--std=" + self._vhdl_standard._standard[2:]
+        return self._ghdl_standard_option
 
-    def _ghdl_analyze_file(self, file: SourceFile, output_path: Path) -> bool:
+    def _get_ghdl_workdir(self, library_name: str) -> str:
+        """
+        Each library is analyzed into a separate work directory, relative to the output path.
+        So that GHDL calls for different libraries, which may run in parallel, never write to the
+        same directory.
+        Also avoids name clashes between design units with the same name in different libraries.
+        """
+        return f"{self.GHDL_OUT}/{library_name}"
 
-        file_path = Path(file.name).absolute()
-        
-        cmd = [
-            "ghdl",
-            "-a",
-            self._get_ghdl_standard_option(),
-            f"--workdir={self.GHDL_OUT}",
-            f"-P={self.GHDL_OUT}",
-            f"--work={file.library.name}",
-            file_path.as_posix(),
-        ]
-        
-        print(f"Running GHDL Analyze on {file.name}")
+    def _get_ghdl_library_options(self) -> List[str]:
+        """
+        Options that make GHDL find all the libraries that are part of the build.
+        """
+        if self._ghdl_library_options is None:
+            # Makes sure that the library compile order is known.
+            self._get_required_synthesis_files()
+
+            self._ghdl_library_options = [
+                f"-P{self._get_ghdl_workdir(library_name)}"
+                for library_name in self._library_compile_order
+            ]
+
+        return self._ghdl_library_options
+
+    def _ghdl_analyze_files(
+        self, files: List[SourceFile], library_name: str, output_path: Path
+    ) -> bool:
+        # VUnit might keep the file name relative to the current working directory.
+        # GHDL is run in the output folder, so the path must be made absolute.
+        # Note that 'resolve' is not needed, which saves a number of syscalls for each file.
+        file_paths = [Path(file.name).absolute().as_posix() for file in files]
+
+        cmd = (
+            [
+                str(self._get_ghdl_path()),
+                "-a",
+                self._get_ghdl_standard_option(),
+                f"--workdir={self._get_ghdl_workdir(library_name)}",
+            ]
+            + self._get_ghdl_library_options()
+            + [f"--work={library_name}"]
+            + file_paths
+        )
+
+        print(f"Running GHDL Analyze on {', '.join(file.name for file in files)}")
         return self._run_process(cmd, output_path)
 
     def _ghdl_analyze(self, output_path: Path) -> bool:
+        vhdl_files = self._get_vhdl_files()
+
+        # Analyze many files in one single GHDL call, which is a lot faster than one call per
+        # file since each call has a startup cost.
+        # Only files that are adjacent in the compile order are grouped, so that the order is
+        # kept also if libraries depend on each other back and forth.
+        groups = [
+            (library_name, list(library_files))
+            for library_name, library_files in groupby(
+                vhdl_files, key=lambda file: file.library.name
+            )
+        ]
 
-        success = False
+        cache_keys = None if self._ghdl_cache_path is None else self._get_ghdl_cache_keys(groups)
 
-        # TODO: This can be optimized to reduce the number of GHDL calls, further reducing runtime.
-        for file in self._get_required_synthesis_files():
-            if file.name.endswith(".vhd"):
-                success = self._ghdl_analyze_file(file, output_path)
-                if not success:
-                    return success
+        # GHDL requires that the work directory exists.
+        # Create all of them up front, so that every library search path given to GHDL exists.
+        for library_name in self._library_compile_order:
+            (output_path / self._get_ghdl_workdir(library_name)).mkdir(parents=True, exist_ok=True)
 
-        return success
+        def analyze(group_idx: int) -> bool:
+            library_name, files = groups[group_idx]
+            workdir = output_path / self._get_ghdl_workdir(library_name)
 
-    def _create_script(self) -> str:
+            if cache_keys is None:
+                return self._ghdl_analyze_files(
+                    files=files, library_name=library_name, output_path=output_path
+                )
 
-        script = []
+            assert self._ghdl_cache_path is not None
+            cache_folder = self._ghdl_cache_path / cache_keys[group_idx]
 
-        # Load GHDL top level library
-        top_library = self._get_top_file().library.name
-        script.append(f"ghdl {self._get_ghdl_standard_option()} --work={top_library} --workdir={self.GHDL_OUT} -P={self.GHDL_OUT}")
-            
-        # TODO: Load verilog files here!
+            if cache_folder.exists():
+                print(f"Using cached GHDL analysis of {', '.join(file.name for file in files)}")
+                copytree(cache_folder, workdir, dirs_exist_ok=True)
+                return True
+
+            success = self._ghdl_analyze_files(
+                files=files, library_name=library_name, output_path=output_path
+            )
+            if success:
+                self._store_in_ghdl_cache(workdir=workdir, cache_folder=cache_folder)
 
-        # Set synthesis command
-        script.append(self._get_synth_command())
+            return success
 
-        # Static timing analysys
-        script.append("sta")
+        # The time is spent in the GHDL processes, so use threads to analyze the groups
+        # within a level in parallel.
+        # Each library is written to its own GHDL work directory.
+        with ThreadPoolExecutor() as executor:
+            for level in self._get_analyze_levels(groups=groups):
+                results = list(executor.map(analyze, level))
+                if not all(results):
+                    return False
 
-        # Create script command
-        script_str = "; ".join(script)
-        
-        return script_str
+        # Note that nothing has failed if there were no files to analyze.
+        return True
 
-    def _run_yosys(self, output_path: Path) -> bool:
+    def _get_ghdl_cache_keys(self, groups: List[tuple[str, List[SourceFile]]]) -> List[str]:
+        """
+        Get a cache key for the analysis of each group of files.
+        The key of each group is based on the key of the group before it.
+        Meaning that a change in any library will invalidate the cache for all libraries that
+        come after it in the compile order.
+        """
+        ghdl_path = self._get_ghdl_path()
+        ghdl_stat = ghdl_path.stat()
+        previous_key = (
+            f"{ghdl_path} {ghdl_stat.st_size} {ghdl_stat.st_mtime_ns} "
+            f"{self._get_ghdl_standard_option()}"
+        )
+
+        keys = []
+        for library_name, files in groups:
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(previous_key.encode())
+            hasher.update(library_name.encode())
+
+            for file in files:
+                file_path = Path(file.name).absolute()
+                hasher.update(file_path.as_posix().encode())
+                hasher.update(file_path.read_bytes())
+
+            previous_key = hasher.hexdigest()
+            keys.append(previous_key)
+
+        return keys
+
+    def _store_in_ghdl_cache(self, workdir: Path, cache_folder: Path) -> None:
+        """
+        Copy the analysis result to the cache.
+        The copy is made to a temporary folder that is then renamed, so that a partial result
+        is never visible in the cache.
+        """
+        cache_folder.parent.mkdir(parents=True, exist_ok=True)
+        temp_folder = Path(tempfile.mkdtemp(dir=cache_folder.parent))
+
+        copytree(workdir, temp_folder, dirs_exist_ok=True)
+
+        try:
+            os.replace(temp_folder, cache_folder)
+        except OSError:
+            # Another build stored the same result at the same time.
+            rmtree(temp_folder)
+
+    def _get_analyze_levels(self, groups: List[tuple[str, List[SourceFile]]]) -> List[List[int]]:
+        """
+        Sort groups of files, in compile order, into levels.
+        The groups within one level do not depend on each other and can be analyzed in parallel.
+        Each level depends only on groups in earlier levels.
+
+        Return:
+            The indexes of the groups that belong to each level.
+        """
+        group_levels: List[int] = []
+
+        for group_idx, (_, files) in enumerate(groups):
+            # The libraries needed to analyze these files, including the library itself.
+            # Means that a group will always wait for earlier groups of the same library.
+            dependency_libraries = {
+                file.library.name for file in self._vunit_proj.get_compile_order(files)
+            }
 
-        script = self._create_script()
+            level = 0
+            for earlier_group_idx in range(group_idx):
+                if groups[earlier_group_idx][0] in dependency_libraries:
+                    level = max(level, group_levels[earlier_group_idx] + 1)
 
-        cmd = [self._get_yosys_path(), "-m", "ghdl", "-p", script]
+            group_levels.append(level)
+
+        levels: List[List[int]] = [[] for _ in range(max(group_levels, default=-1) + 1)]
+        for group_idx, level in enumerate(group_levels):
+            levels[level].append(group_idx)
+
+        return levels
+
+    def _create_script(self) -> str:
+        top_library = self._get_top_file().library.name
+        ghdl_options = [
+            self._get_ghdl_standard_option(),
+            f"--work={top_library}",
+            f"--workdir={self._get_ghdl_workdir(top_library)}",
+        ] + self._get_ghdl_library_options()
+
+        script = [
+            # Load GHDL top level library
+            f"ghdl {' '.join(ghdl_options)}",
+            # TODO: Load verilog files here!
+            # Set synthesis command
+            self._get_synth_command(),
+            # Static timing analysys
+            "sta",
+        ]
+
+        # One command per line, as in a Yosys script file.
+        return "\n".join(script) + "\n"
+
+    def _run_yosys(self, output_path: Path) -> bool:
+        # Write the script to a file rather than passing it on the command line.
+        # Avoids any command length limit, and makes it possible to inspect or re-run the
+        # script afterwards.
+        # Note that Yosys is run with the output path as working directory, so the path to the
+        # script must be relative to that.
+        # Same as the GHDL work directories in the script.
+        script_file = Path(self.YOSYS_OUT) / f"{self.name}.ys"
+        create_file(output_path / script_file, self._create_script())
+
+        cmd = [str(self._get_yosys_path()), "-m", "ghdl", "-s", str(script_file)]
 
         success = self._run_process(cmd, output_path)
         return success
@@ -1,8 +1,70 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
 import pytest
+from tsfpga.module import BaseModule
 from tsfpga.module_list import ModuleList
+from tsfpga.system_utils import create_file
 from tsfpga.yosys.project import YosysNetlistBuild
 from vunit.vhdl_standard import VHDLStandard
 
+# Create each standard object only once, and share it between the test cases.
+VHDL_STANDARDS = {name: VHDLStandard(name) for name in ["1993", "2002", "2008", "2019"]}
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture
+def yosys_test(tmp_path):
+    class YosysTestFixture:
+        """
+        By default there is a library "a" with a package, which is used by the top level
+        entity in library "hest".
+        """
+
+        def __init__(self):
+            self.modules_folder = tmp_path
+
+            self.a_pkg = self.create_package(library_name="a", name="a_pkg")
+            self.top = self.create_top(packages=["a.a_pkg"])
+
+        def create_package(self, library_name, name, packages=()):
+            return create_file(
+                self.modules_folder / library_name / "src" / f"{name}.vhd",
+                f"{self._get_context(packages)}package {name} is\nend package;\n",
+            )
+
+        def create_top(self, packages=()):
+            return create_file(
+                self.modules_folder / "hest" / "src" / "hest_top.vhd",
+                f"{self._get_context(packages)}entity hest_top is\nend entity;\n",
+            )
+
+        def create_project(self, library_names, **kwargs):
+            modules = ModuleList()
+            for library_name in library_names:
+                modules.append(
+                    BaseModule(path=self.modules_folder / library_name, library_name=library_name)
+                )
+
+            kwargs.setdefault("ghdl_path", self.modules_folder / "ghdl")
+
+            return YosysNetlistBuild(name="hest", top="hest_top", modules=modules, **kwargs)
+
+        @staticmethod
+        def _get_context(packages):
+            """
+            Each package is given as "<library name>.<package name>".
+            """
+            result = ""
+            for package in packages:
+                library_name = package.split(".")[0]
+                result += f"library {library_name};\nuse {package}.all;\n\n"
+
+            return result
+
+    return YosysTestFixture()
+
 
 def test_no_modules_doesnt_find_top_level():
 
@@ -19,24 +81,322 @@ def test_no_modules_doesnt_find_top_level():
     assert files == None
 
 
-def test_create_script():
+def test_top_file_and_required_synthesis_files_are_resolved_only_once(yosys_test):
+    yosys_test.create_top()
+    proj = yosys_test.create_project(library_names=["hest"])
+
+    with patch.object(
+        proj._vunit_proj, "get_source_files", wraps=proj._vunit_proj.get_source_files
+    ) as get_source_files, patch.object(
+        proj._vunit_proj,
+        "get_implementation_subset",
+        wraps=proj._vunit_proj.get_implementation_subset,
+    ) as get_implementation_subset:
+        files = proj._get_required_synthesis_files()
+        assert [Path(file.name).name for file in files] == ["hest_top.vhd"]
+        assert proj._get_required_synthesis_files() is files
+
+        get_implementation_subset.assert_called_once()
+
+        assert proj._get_top_file() is proj._get_top_file()
+        get_source_files.assert_called_once()
+
+    assert proj._library_compile_order == ["hest"]
+
+
+def test_ghdl_is_called_with_absolute_file_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_file(Path("hest") / "src" / "hest_top.vhd", "entity hest_top is\nend entity;\n")
+
+    modules = ModuleList()
+    modules.append(BaseModule(path=Path("hest"), library_name="hest"))
+    proj = YosysNetlistBuild(
+        name="hest", top="hest_top", modules=modules, ghdl_path=tmp_path / "ghdl"
+    )
+
+    with patch.object(proj, "_run_process", autospec=True) as run_process:
+        run_process.return_value = True
+        assert proj._ghdl_analyze(output_path=tmp_path / "out")
+
+    cmd = run_process.call_args.args[0]
+    assert cmd[-1] == (tmp_path / "hest" / "src" / "hest_top.vhd").as_posix()
+
+
+def test_ghdl_analyze_is_called_once_for_each_library(yosys_test, tmp_path):
+    a_pkg = yosys_test.a_pkg
+    b_pkg = yosys_test.create_package(library_name="a", name="b_pkg")
+    top = yosys_test.create_top(packages=["a.a_pkg", "a.b_pkg"])
+    proj = yosys_test.create_project(library_names=["a", "hest"])
+
+    with patch.object(proj, "_run_process", autospec=True) as run_process:
+        run_process.return_value = True
+        assert proj._ghdl_analyze(output_path=tmp_path / "out")
+
+    assert run_process.call_count == 2
+
+    cmd = run_process.call_args_list[0].args[0]
+    assert "--work=a" in cmd
+    assert "--workdir=ghdl/a" in cmd
+    assert "-Pghdl/a" in cmd
+    assert "-Pghdl/hest" in cmd
+    # VUnit might keep the paths relative to the current working directory, which is not
+    # necessarily an ancestor of the files.
+    assert {Path(path).resolve() for path in cmd[-2:]} == {a_pkg.resolve(), b_pkg.resolve()}
+
+    cmd = run_process.call_args_list[1].args[0]
+    assert "--work=hest" in cmd
+    assert "--workdir=ghdl/hest" in cmd
+    assert (tmp_path / "out" / "ghdl" / "a").is_dir()
+    assert (tmp_path / "out" / "ghdl" / "hest").is_dir()
+    assert Path(cmd[-1]).resolve() == top.resolve()
+
+
+def test_ghdl_analyze_with_cache(yosys_test, tmp_path):
+    ghdl_path = create_file(tmp_path / "ghdl")
+
+    def run_process(cmd, cwd):
+        # Emulate GHDL by creating a library file in the work directory.
+        workdir = next(arg for arg in cmd if arg.startswith("--workdir="))[len("--workdir=") :]
+        library_name = next(arg for arg in cmd if arg.startswith("--work="))[len("--work=") :]
+        create_file(cwd / workdir / f"{library_name}-obj08.cf", library_name)
+        return True
+
+    def analyze(output_path):
+        proj = yosys_test.create_project(
+            library_names=["a", "hest"], ghdl_path=ghdl_path, ghdl_cache_path=tmp_path / "cache"
+        )
+
+        with patch.object(proj, "_run_process", autospec=True) as mock:
+            mock.side_effect = run_process
+            assert proj._ghdl_analyze(output_path=output_path)
+
+        assert (output_path / "ghdl" / "a" / "a-obj08.cf").exists()
+        assert (output_path / "ghdl" / "hest" / "hest-obj08.cf").exists()
+
+        return mock.call_count
+
+    assert analyze(tmp_path / "out1") == 2
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+    # Everything is restored from the cache.
+    assert analyze(tmp_path / "out2") == 0
+
+    # Change in a library shall re-analyze it, and everything after it.
+    create_file(yosys_test.a_pkg, "package a_pkg is\n  constant c : integer := 0;\nend package;\n")
+    assert analyze(tmp_path / "out3") == 2
+    assert analyze(tmp_path / "out4") == 0
+
+
+def test_create_script_loads_all_libraries(yosys_test):
+    proj = yosys_test.create_project(library_names=["a", "hest"])
+
+    assert proj._create_script() == (
+        "ghdl --std=08 --work=hest --workdir=ghdl/hest -Pghdl/a -Pghdl/hest\n"
+        "synth -top hest_top\n"
+        "sta\n"
+    )
+
+
+def test_run_yosys_with_script_file(tmp_path):
+    proj = YosysNetlistBuild(
+        name="hest", top="hest_top", modules=ModuleList(), yosys_path=tmp_path / "yosys"
+    )
+
+    with patch.object(proj, "_create_script", autospec=True) as create_script, patch.object(
+        proj, "_run_process", autospec=True
+    ) as run_process:
+        create_script.return_value = "apa\n"
+        run_process.return_value = True
+
+        assert proj._run_yosys(output_path=tmp_path / "out")
+
+    script_file = tmp_path / "out" / "yosys" / "hest.ys"
+    assert script_file.read_text(encoding="utf-8") == "apa\n"
+    run_process.assert_called_once_with(
+        [str(tmp_path / "yosys"), "-m", "ghdl", "-s", str(Path("yosys") / "hest.ys")],
+        tmp_path / "out",
+    )
+
+
+def test_run_yosys_with_relative_output_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    proj = YosysNetlistBuild(
+        name="hest", top="hest_top", modules=ModuleList(), yosys_path=tmp_path / "yosys"
+    )
+
+    def run_process(cmd, cwd):
+        # Yosys is run in the output folder, and must be able to find the script from there.
+        return (cwd / cmd[-1]).exists()
+
+    with patch.object(proj, "_create_script", autospec=True) as create_script, patch.object(
+        proj, "_run_process", autospec=True
+    ) as mock:
+        create_script.return_value = "apa\n"
+        mock.side_effect = run_process
+
+        assert proj._run_yosys(output_path=Path("build_out"))
+
+
+def test_ghdl_analyze_failure_should_abort(yosys_test, tmp_path):
+    proj = yosys_test.create_project(library_names=["a", "hest"])
+
+    with patch.object(proj, "_run_process", autospec=True) as run_process:
+        run_process.return_value = False
+        assert not proj._ghdl_analyze(output_path=tmp_path / "out")
+
+    run_process.assert_called_once()
+
+
+def test_independent_libraries_are_analyzed_in_the_same_level(yosys_test, tmp_path):
+    yosys_test.create_package(library_name="c", name="c_pkg")
+    yosys_test.create_package(library_name="d", name="d_pkg", packages=["c.c_pkg"])
+    yosys_test.create_top(packages=["a.a_pkg", "d.d_pkg"])
+    proj = yosys_test.create_project(library_names=["a", "c", "d", "hest"])
+
+    vhdl_files = proj._get_required_synthesis_files()
+    groups = [(file.library.name, [file]) for file in vhdl_files]
+
+    levels = proj._get_analyze_levels(groups=groups)
+    library_names = [{groups[group_idx][0] for group_idx in level} for level in levels]
+    assert library_names == [{"a", "c"}, {"d"}, {"hest"}]
+
+    with patch.object(proj, "_run_process", autospec=True) as run_process:
+        run_process.return_value = True
+        assert proj._ghdl_analyze(output_path=tmp_path / "out")
+
+    assert run_process.call_count == 4
+    assert "--work=hest" in run_process.call_args_list[-1].args[0]
+
+
+def test_ghdl_analyze_without_vhdl_files_should_succeed(tmp_path):
+    proj = YosysNetlistBuild(name="hest", top="hest_top", modules=ModuleList())
+
+    with patch.object(
+        proj, "_get_required_synthesis_files", autospec=True
+    ) as get_required_synthesis_files, patch.object(
+        proj, "_run_process", autospec=True
+    ) as run_process:
+        get_required_synthesis_files.return_value = []
+        assert proj._ghdl_analyze(output_path=tmp_path / "out")
+
+    run_process.assert_not_called()
+
+
+def test_get_vhdl_and_verilog_files(tmp_path):
+    proj = YosysNetlistBuild(name="hest", top="hest_top", modules=ModuleList())
+
+    files = [MagicMock() for _ in range(4)]
+    for file, name in zip(files, ["a.vhd", "b.v", "c.vhdl", "d.sv"]):
+        file.name = str(tmp_path / name)
+
+    with patch.object(
+        proj, "_get_required_synthesis_files", autospec=True
+    ) as get_required_synthesis_files:
+        get_required_synthesis_files.return_value = files
+
+        assert proj._get_vhdl_files() == [files[0], files[2]]
+        assert proj._get_verilog_files() == [files[1], files[3]]
+        assert proj._get_vhdl_files() == [files[0], files[2]]
+
+    get_required_synthesis_files.assert_called_once()
+
+
+def test_run_process_returns_whether_command_succeeded(tmp_path):
+    proj = YosysNetlistBuild(name="hest", top="hest_top", modules=ModuleList())
+
+    assert proj._run_process([sys.executable, "-c", "exit(0)"], cwd=tmp_path)
+    assert not proj._run_process([sys.executable, "-c", "exit(1)"], cwd=tmp_path)
 
-    for vhdl_standard in ["1993", "2002", "2008", "2019"]:
-        for synth_command in [None, "synth_xilinx"]:
-            proj = YosysNetlistBuild(
-                name="hest",
-                modules=ModuleList(),
-                top="hest_top",
-                synth_command=synth_command,
-                vhdl_standard=VHDLStandard(vhdl_standard),
-            )
-            script = proj._create_script()
 
-            expected_script = f"ghdl --std={vhdl_standard[2:]}"
+def test_build_should_not_run_yosys_if_ghdl_analyze_fails(tmp_path):
+    proj = YosysNetlistBuild(name="hest", top="hest_top", modules=ModuleList())
 
-            if synth_command:
-                expected_script += synth_command + "-top hest" + ";"
-            else:
-                expected_script += f"synth;"
+    with patch.object(proj, "_ghdl_analyze", autospec=True) as ghdl_analyze, patch.object(
+        proj, "_run_yosys", autospec=True
+    ) as run_yosys:
+        ghdl_analyze.return_value = False
+        assert not proj.build(output_path=tmp_path / "out")
+
+    run_yosys.assert_not_called()
+
+
+def test_ghdl_standard_option():
+    for vhdl_standard, expected in [("1993", "--std=93"), ("2008", "--std=08")]:
+        proj = YosysNetlistBuild(
+            name="hest",
+            top="hest_top",
+            modules=ModuleList(),
+            vhdl_standard=VHDL_STANDARDS[vhdl_standard],
+        )
+        assert proj._get_ghdl_standard_option() == expected
+
+
+def test_vunit_project_is_shared_between_builds_with_same_files(yosys_test):
+    yosys_test.create_package(library_name="b", name="b_pkg")
+
+    proj_a = yosys_test.create_project(library_names=["a"])
+    proj_a_again = yosys_test.create_project(library_names=["a"])
+    proj_a_b = yosys_test.create_project(library_names=["a", "b"])
+
+    assert proj_a._vunit_proj is proj_a_again._vunit_proj
+    assert proj_a._vunit_proj is not proj_a_b._vunit_proj
+
+
+def test_top_file_name_must_match_exactly(tmp_path):
+    top_file = create_file(tmp_path / "a" / "src" / "hest_top.vhd", "entity hest_top is\nend;\n")
+    create_file(tmp_path / "a" / "src" / "not_hest_top.vhd", "entity not_hest_top is\nend;\n")
+
+    modules = ModuleList()
+    modules.append(BaseModule(path=tmp_path / "a", library_name="a"))
+
+    proj = YosysNetlistBuild(name="hest", top="hest_top", modules=modules)
+    assert Path(proj._get_top_file().name).resolve() == top_file.resolve()
+
+    proj = YosysNetlistBuild(name="hest", top="est_top", modules=modules)
+    assert proj._get_top_file() is None
+
+
+def test_tool_paths_are_searched_for_only_once(tmp_path):
+    proj = YosysNetlistBuild(name="foo", top="foo_top", modules=ModuleList())
+
+    with patch("tsfpga.yosys.project.which", autospec=True) as which:
+        which.side_effect = lambda name: str(tmp_path / name)
+
+        assert proj._get_ghdl_path() == tmp_path / "ghdl"
+        assert proj._get_ghdl_path() == tmp_path / "ghdl"
+        assert proj._get_yosys_path() == tmp_path / "yosys"
+        assert proj._get_yosys_path() == tmp_path / "yosys"
+
+        assert which.call_count == 2
+
+
+def test_tool_not_found_should_raise_error():
+    proj = YosysNetlistBuild(name="foo", top="foo_top", modules=ModuleList())
+
+    with patch("tsfpga.yosys.project.which", autospec=True) as which:
+        which.return_value = None
+
+        with pytest.raises(FileNotFoundError) as exception_info:
+            proj._get_yosys_path()
+        assert str(exception_info.value) == "Could not find yosys on PATH"
+
+
+@pytest.mark.parametrize("vhdl_standard", VHDL_STANDARDS)
+@pytest.mark.parametrize("synth_command", [None, "synth_xilinx"])
+def test_create_script(yosys_test, vhdl_standard, synth_command):
+    yosys_test.create_top()
+    proj = yosys_test.create_project(
+        library_names=["hest"],
+        synth_command=synth_command,
+        vhdl_standard=VHDL_STANDARDS[vhdl_standard],
+    )
+
+    expected_script = "".join(
+        [
+            f"ghdl --std={vhdl_standard[2:]} --work=hest --workdir=ghdl/hest -Pghdl/hest\n",
+            f"{'synth' if synth_command is None else synth_command} -top hest_top\n",
+            "sta\n",
+        ]
+    )
 
-            assert script == expected_script
+    assert proj._create_script() == expected_script